@@ -1,6 +1,10 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 import arxiv
+import asyncio
 import logging
+import orjson
+import time
+from cachetools import TLRUCache
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
@@ -16,6 +20,19 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
+SECONDS_PER_DAY = 86400
+
+def _expire_at_midnight_utc(key, value, now):
+    """arXiv publishes new listings once a day, so cached results expire at the next UTC midnight"""
+    return (now // SECONDS_PER_DAY + 1) * SECONDS_PER_DAY
+
+# (category, limit) -> JSON-encoded list of articles
+_articles_cache = TLRUCache(maxsize=256, ttu=_expire_at_midnight_utc, timer=time.time)
+
+# Shared for the whole process so its HTTP session is reused. A single page
+# covers the endpoint's 50-article limit, so the between-page delay never applies.
+_ARXIV_CLIENT = arxiv.Client(page_size=100, delay_seconds=0.0, num_retries=3)
+
 class Author(BaseModel):
     name: str
 
@@ -30,37 +47,48 @@ class Article(BaseModel):
     primary_category: str
     summary: Optional[str] = None
 
+def _build_article(result):
+    return {
+        "title": result.title,
+        "authors": [{"name": author.name} for author in result.authors],
+        "submitted": result.published.strftime('%Y-%m-%d %H:%M:%S UTC'),
+        "updated": result.updated.strftime('%Y-%m-%d %H:%M:%S UTC'),
+        "arxiv_id": result.get_short_id(),
+        "abstract_url": result.entry_id,
+        "pdf_url": result.pdf_url,
+        "primary_category": result.primary_category,
+        "summary": result.summary[:500] if result.summary else None
+    }
+
+def _fetch_recent_articles(category, limit):
+    """Query arXiv for the newest articles in a category. Blocking, so run it in a thread."""
+    search = arxiv.Search(
+        query=f"cat:{category}",
+        max_results=limit,
+        sort_by=arxiv.SortCriterion.SubmittedDate,
+        sort_order=arxiv.SortOrder.Descending
+    )
+    return [_build_article(result) for result in _ARXIV_CLIENT.results(search)]
+
+# Article only documents the response schema; the endpoint builds plain dicts
+# and returns pre-encoded JSON rather than validating its own output
 @router.get("/recent", 
-    response_model=List[Article],
+    responses={200: {"model": List[Article]}},
     summary="Get Recent ArXiv Articles",
     description="Retrieve the most recent articles from ArXiv for a given category")
 async def get_recent_articles(
     category: str = Query("cs.AI", description="ArXiv category (e.g., cs.AI, cs.CL)"),
     limit: int = Query(10, description="Number of articles to return", le=50)
 ):
-    try:
-        search = arxiv.Search(
-            query=f"cat:{category}",
-            max_results=limit,
-            sort_by=arxiv.SortCriterion.SubmittedDate,
-            sort_order=arxiv.SortOrder.Descending
-        )
+    cache_key = (category, limit)
+    cached = _articles_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
 
-        articles = []
-        # Remove async_results and directly use search.results()
-        for result in search.results():
-            article = Article(
-                title=result.title,
-                authors=[Author(name=author.name) for author in result.authors],
-                submitted=result.published.strftime('%Y-%m-%d %H:%M:%S UTC'),
-                updated=result.updated.strftime('%Y-%m-%d %H:%M:%S UTC'),
-                arxiv_id=result.get_short_id(),
-                abstract_url=result.entry_id,
-                pdf_url=result.pdf_url,
-                primary_category=result.primary_category,
-                summary=result.summary[:500] if result.summary else None
-            )
-            articles.append(article)
+    try:
+        # A single page covers the limit, so fetch and build everything in one
+        # thread call rather than stepping the iterator from the event loop
+        articles = await asyncio.to_thread(_fetch_recent_articles, category, limit)
 
         if not articles:
             raise HTTPException(
@@ -68,8 +96,12 @@ async def get_recent_articles(
                 detail=f"No articles found for category: {category}"
             )
 
-        return articles
+        content = orjson.dumps(articles)
+        _articles_cache[cache_key] = content
+        return Response(content=content, media_type="application/json")
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching arXiv articles: {str(e)}")
         raise HTTPException(
@@ -1,6 +1,11 @@
 # api/financial_insights.py
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache, cached
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel, constr
+from services.cache import INSIGHTS_POLICY, cache_response
 from services.fin_insight_service import get_financial_data
 
 router = APIRouter(
@@ -9,12 +14,22 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# get_financial_data blocks, so it runs off the event loop on a bounded pool
+# (at most 8 concurrent fin_insight calls) behind a short per-ticker cache.
+# The cached payload holds the detailed fields too, so `detailed` is not part of the key.
+_fin_insight_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="fin_insight")
+_cached_get_financial_data = cached(
+    TTLCache(maxsize=512, ttl=300), lock=threading.Lock()
+)(get_financial_data)
+
 # --- Data Models ---
 class TickerInput(BaseModel):
     ticker: constr(strip_whitespace=True, to_lower=True)
 
 @router.get("/")
+@cache_response(INSIGHTS_POLICY)
 async def get_financial_insights(
+    request: Request,
     ticker: str = Query(..., description="Stock ticker symbol (e.g., AAPL)"),
     detailed: bool = Query(False, description="Get detailed financial information")
 ):
@@ -24,7 +39,10 @@ async def get_financial_insights(
             raise HTTPException(status_code=400, detail="Ticker symbol cannot be empty")
             
         try:
-            company_info = get_financial_data(ticker_input)
+            loop = asyncio.get_running_loop()
+            company_info = await loop.run_in_executor(
+                _fin_insight_executor, _cached_get_financial_data, ticker_input
+            )
         except ValueError as ve:
             raise HTTPException(status_code=500, detail=str(ve))
         
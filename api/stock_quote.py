@@ -1,8 +1,25 @@
+import asyncio
 import requests
 import os
-from fastapi import APIRouter, HTTPException, Query
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, HTTPException, Query, Request
 import httpx
-from api.stock_quote_tiingo import get_intraday_price_tiingo_or_yfinance
+from api.stock_quote_tiingo import (
+    get_approximate_delayed_price_yfinance,
+    get_delayed_price_tiingo_intraday_async,
+)
+from services.cache import QUOTE_POLICY, cache_response
+
+# Read once at import; start_engine_room.py loads .env before the app starts
+ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
+TIINGO_API_KEY = os.getenv("TIINGO_API_KEY")
+
+def log_missing_api_keys():
+    """Report at startup which quote providers will be unavailable"""
+    if not ALPHA_VANTAGE_API_KEY:
+        print("ALPHA_VANTAGE_API_KEY is not set, /stock_quote requests will fail")
+    if not TIINGO_API_KEY:
+        print("TIINGO_API_KEY is not set, stock quotes will skip Tiingo")
 
 def get_daily_adjusted_close(symbol, api_key):
     """
@@ -46,80 +63,109 @@ def get_daily_adjusted_close(symbol, api_key):
         print(f"Data Parsing Error: {e}")
         return None
 
-async def get_stock_price_tiingo(ticker):
-    """
-    Gets the latest stock price from Tiingo.
+# Target delay for the Tiingo IEX and yfinance intraday prices
+QUOTE_DELAY_MINUTES = 15
+# How long to wait for any provider to come back with a price
+QUOTE_TIMEOUT_SECONDS = 3
+# yfinance has no async API and a cancelled thread keeps running, so its calls
+# get their own small pool: losing races can't pile up on the default executor
+_yfinance_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="yfinance")
 
-    Args:
-        ticker (str): The stock ticker symbol.
+async def av_quote(client: httpx.AsyncClient, ticker, api_key):
+    """
+    Gets the latest price from the Alpha Vantage GLOBAL_QUOTE endpoint.
 
     Returns:
-        str: The latest stock price, or None if an error occurs.
+        tuple: (price, "Alpha Vantage"), or None if no price was returned.
     """
-    api_key = os.getenv("TIINGO_API_KEY")
-    if not api_key:
-        raise HTTPException(status_code=500, detail="Tiingo API key not found")
-
-    url = f'https://api.tiingo.com/tiingo/daily/{ticker}/prices'
+    url = 'https://www.alphavantage.co/query'
     params = {
-        'token': api_key,
-        'startDate': '1970-01-01',
-        'endDate': '2099-12-31'
+        'function': 'GLOBAL_QUOTE',
+        'symbol': ticker,
+        'apikey': api_key
     }
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+    response = await client.get(url, params=params)
+    response.raise_for_status()
+    data = response.json()
 
-    if not data:
+    if "Global Quote" not in data:
+        print(f"Alpha Vantage API response for {ticker}: {data}")
+        print(f"Global Quote not found in Alpha Vantage response")
         return None
 
-    latest_price = data[0].get("close", "N/A")
+    price = data["Global Quote"].get("05. price", "N/A")
+    if price in [None, "N/A"]:
+        print(f"Alpha Vantage returned null/N/A price for {ticker}")
+        return None
+    return price, "Alpha Vantage"
 
-    return latest_price
+async def tiingo_quote(client: httpx.AsyncClient, ticker, api_key):
+    """
+    Gets the delayed IEX intraday price from Tiingo.
 
-async def get_intraday_price_tiingo_or_yfinance_async(ticker):
+    Returns:
+        tuple: (price, "Tiingo"), or None if no price was returned.
     """
-    Async wrapper for get_intraday_price_tiingo_or_yfinance function.
-    
-    Args:
-        ticker (str): The stock ticker symbol.
-        
+    price, timestamp = await get_delayed_price_tiingo_intraday_async(
+        client, ticker, api_key, QUOTE_DELAY_MINUTES
+    )
+    if price is None:
+        return None
+    print(f"Successfully retrieved price from Tiingo at {timestamp}: ${price:.2f}")
+    return price, "Tiingo"
+
+async def yf_quote(ticker):
+    """
+    Gets the approximate delayed price from yfinance without blocking the event loop.
+
+    The lookup runs on `_yfinance_executor`. Cancelling this coroutine only
+    drops a call that is still queued; one that has started runs to
+    completion, and its history download is kept in the per-minute cache.
+
     Returns:
-        tuple: (price, source, timestamp) from either Tiingo or yfinance
+        tuple: (price, "yfinance"), or None if no price was returned.
     """
-    # Get the API key for Tiingo
-    tiingo_api_key = os.getenv("TIINGO_API_KEY")
-    if not tiingo_api_key:
-        print("Tiingo API key not found, falling back to yfinance only")
-        # Import the yfinance-specific function directly
-        from api.stock_quote_tiingo import get_approximate_delayed_price_yfinance
-        
-        # Use 15-minute delay as default
-        delay_minutes = 15
-        
-        # Run the yfinance function in a thread pool
-        import asyncio
-        loop = asyncio.get_event_loop()
-        price, timestamp = await loop.run_in_executor(
-            None, 
-            lambda: get_approximate_delayed_price_yfinance(ticker, delay_minutes)
-        )
-        
-        return price, "yfinance", timestamp
-    
-    # Use 15-minute delay as default
-    delay_minutes = 15
-    
-    # Run the synchronous function in a thread pool to avoid blocking
-    import asyncio
-    loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(
-        None, 
-        lambda: get_intraday_price_tiingo_or_yfinance(ticker, tiingo_api_key, delay_minutes)
+    loop = asyncio.get_running_loop()
+    price, timestamp = await loop.run_in_executor(
+        _yfinance_executor, get_approximate_delayed_price_yfinance, ticker, QUOTE_DELAY_MINUTES
     )
-    
-    return result
+    if price is None:
+        return None
+    print(f"Successfully retrieved price from yfinance at {timestamp}: ${price:.2f}")
+    return price, "yfinance"
+
+async def first_quote(quote_coros, timeout=QUOTE_TIMEOUT_SECONDS):
+    """
+    Runs the provider coroutines concurrently and returns the first non-None
+    (price, source) result. Providers still running once a price is found, or
+    when `timeout` expires, are cancelled. That stops in-flight HTTP requests,
+    but not a yfinance lookup already running in its thread (see yf_quote).
+
+    Returns:
+        tuple: (price, source), or None if no provider returned a price in time.
+    """
+    tasks = [asyncio.create_task(coro) for coro in quote_coros]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                print(f"Timed out after {timeout}s waiting for a quote provider")
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is not None:
+                    print(f"Quote provider failed: {task.exception()}")
+                elif task.result() is not None:
+                    return task.result()
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
 
 router = APIRouter(
     prefix="/stock_quote",
@@ -128,40 +174,29 @@ router = APIRouter(
 )
 
 @router.get("/")
-async def get_stock_price(ticker: str = Query(..., description="Stock ticker symbol (e.g., AAPL)")):
+@cache_response(QUOTE_POLICY)
+async def get_stock_price(
+    request: Request,
+    ticker: str = Query(..., description="Stock ticker symbol (e.g., AAPL)")
+):
     try:
-        api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
-        if not api_key:
+        if not ALPHA_VANTAGE_API_KEY:
             raise HTTPException(status_code=500, detail="API key not found")
 
-        url = f'https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={ticker}&apikey={api_key}'
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            data = response.json()
-
-        if "Global Quote" not in data:
-            print(f"Alpha Vantage API response for {ticker}: {data}")
-            print(f"Global Quote not found in Alpha Vantage response, falling back to Tiingo/yfinance")
-            price, source, timestamp = await get_intraday_price_tiingo_or_yfinance_async(ticker)
-            if price is not None:
-                latest_price = str(price)
-                print(f"Successfully retrieved price from {source} at {timestamp}: ${price:.2f}")
-            else:
-                latest_price = "N/A"
-                print(f"Failed to retrieve price from both Tiingo and yfinance")
-        else:
-            latest_price = data["Global Quote"].get("05. price", "N/A")
-            if latest_price in [None, "N/A"]:
-                print(f"Alpha Vantage returned null/N/A price for {ticker}, falling back to Tiingo/yfinance")
-                price, source, timestamp = await get_intraday_price_tiingo_or_yfinance_async(ticker)
-                if price is not None:
-                    latest_price = str(price)
-                    print(f"Successfully retrieved price from {source} at {timestamp}: ${price:.2f}")
-                else:
-                    latest_price = "N/A"
-                    print(f"Failed to retrieve price from both Tiingo and yfinance")
-        return {"ticker": ticker, "latest_price": latest_price}
+        # Ask every provider at once so latency is that of the fastest one,
+        # not the sum of Alpha Vantage plus each fallback in turn
+        client = request.app.state.http_client
+        quote_coros = [av_quote(client, ticker, ALPHA_VANTAGE_API_KEY)]
+        if TIINGO_API_KEY:
+            quote_coros.append(tiingo_quote(client, ticker, TIINGO_API_KEY))
+        quote_coros.append(yf_quote(ticker))
+
+        quote = await first_quote(quote_coros)
+        if quote is None:
+            print(f"Failed to retrieve price for {ticker} from Alpha Vantage, Tiingo and yfinance")
+            # 503 rather than a cached "N/A" lets the quote cache serve its last known price
+            raise HTTPException(status_code=503, detail=f"Price for {ticker} is not available yet")
+        return {"ticker": ticker, "latest_price": str(quote[0])}
     except HTTPException:
         raise
     except Exception as e:
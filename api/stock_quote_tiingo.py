@@ -1,11 +1,61 @@
+import math
 import requests
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, time as dt_time, timedelta
+from zoneinfo import ZoneInfo
 import httpx
 from fastapi import HTTPException
 import yfinance as yf  # Import yfinance
-import pytz
+import threading
 import time
+from cachetools import LRUCache
+
+# US market time, resolved once at import
+EASTERN = ZoneInfo("America/New_York")
+MARKET_OPEN_TIME = dt_time(9, 30)
+
+_TIINGO_HEADERS = {
+    'Content-Type': 'application/json'
+}
+# Keep-alive session for the synchronous Tiingo path, so repeat calls skip the TCP+TLS handshake
+_TIINGO_SESSION = requests.Session()
+_TIINGO_SESSION.headers.update(_TIINGO_HEADERS)
+
+# yf.Ticker objects, reused across calls for the same symbol. Bounded because
+# the symbol comes straight from the client's query string. LRUCache reorders
+# on every get, so it is guarded for the worker threads that call in here.
+_TICKERS = LRUCache(maxsize=512)
+_TICKERS_LOCK = threading.Lock()
+# (symbol, minute bucket) -> 1-minute history in Eastern Time, so calls within
+# the same minute share a single download of the ~780-row frame
+_HIST_CACHE = {}
+
+def _get_yf_ticker(symbol):
+    with _TICKERS_LOCK:
+        ticker = _TICKERS.get(symbol)
+        if ticker is None:
+            ticker = _TICKERS[symbol] = yf.Ticker(symbol)
+    return ticker
+
+def _get_intraday_history(symbol):
+    """Return the last 2 days of 1-minute history for a symbol, cached per minute"""
+    bucket = int(time.time() // 60)
+    data = _HIST_CACHE.get((symbol, bucket))
+    if data is not None:
+        return data
+
+    # Get enough data to cover the delay and current time
+    data = _get_yf_ticker(symbol).history(interval="1m", period="2d")
+    if not data.empty:
+        # Convert the index to Eastern Time.  CRUCIAL step.
+        data.index = data.index.tz_convert(EASTERN)
+    _HIST_CACHE[(symbol, bucket)] = data
+
+    # Evict entries older than 2 minutes
+    for key in list(_HIST_CACHE):
+        if key[1] < bucket - 1:
+            _HIST_CACHE.pop(key, None)
+    return data
 
 def get_intraday_price_tiingo_or_yfinance(symbol, tiingo_api_key, delay_minutes=15):
     """
@@ -40,6 +90,38 @@ def get_intraday_price_tiingo_or_yfinance(symbol, tiingo_api_key, delay_minutes=
 
 
 
+def _parse_tiingo_iex_response(symbol, data):
+    """
+    Extracts the last price from a Tiingo IEX response body.
+
+    Returns:
+        float:  The price, or None if the response holds no usable price.
+        str: The timestamp, or None.
+    """
+    if not data:
+        print(f"No IEX Real-time data found for {symbol} on Tiingo")
+        return None, None
+    
+    # We expect a list, even for a single ticker.
+    if not isinstance(data, list) or len(data) == 0:
+        print(f"Unexpected response format from Tiingo IEX: {data}")
+        return None, None
+
+    price_data = data[0]  # Get the first (and likely only) item
+
+    # Check for error indicators in the response
+    if "ticker" not in price_data or price_data["ticker"].lower() != symbol.lower():
+        print(f"Tiingo IEX returned data for an unexpected ticker: {price_data.get('ticker')}")
+        return None, None
+    if "last" not in price_data:
+        print(f"No 'last' price found in Tiingo IEX response for {symbol}")
+        return None, None
+
+    price = float(price_data["last"])  # Use the "last" price (most recent)
+    timestamp = price_data["timestamp"]  # Tiingo provides a timestamp
+
+    return price, timestamp
+
 def get_delayed_price_tiingo_intraday(symbol, api_key, delay_minutes):
     """
     Gets delayed intraday price from Tiingo using IEX Real-time (if available).
@@ -61,40 +143,49 @@ def get_delayed_price_tiingo_intraday(symbol, api_key, delay_minutes):
     """
     url = f"https://api.tiingo.com/iex/?tickers={symbol}&token={api_key}"
 
-    headers = {
-        'Content-Type': 'application/json'
-    }
-
     try:
-        response = requests.get(url, headers=headers)
+        response = _TIINGO_SESSION.get(url)
         response.raise_for_status()
-        data = response.json()
-
-        if not data:
-            print(f"No IEX Real-time data found for {symbol} on Tiingo")
-            return None, None
-        
-        # We expect a list, even for a single ticker.
-        if not isinstance(data, list) or len(data) == 0:
-            print(f"Unexpected response format from Tiingo IEX: {data}")
-            return None, None
+        return _parse_tiingo_iex_response(symbol, response.json())
+    
+    except requests.exceptions.RequestException as e:
+        print(f"Tiingo IEX Request Error: {e}")
+        return None, None
+    except (KeyError, ValueError, TypeError) as e:
+        print(f"Tiingo IEX Data Parsing Error: {e}")
+        return None, None
+    except Exception as e:
+        print(f"An unexpected error occurred with Tiingo IEX: {e}")
+        return None, None
 
-        price_data = data[0]  # Get the first (and likely only) item
+async def get_delayed_price_tiingo_intraday_async(client: httpx.AsyncClient, symbol, api_key, delay_minutes):
+    """
+    Async version of get_delayed_price_tiingo_intraday that uses the
+    application's shared HTTP client instead of a blocking request.
 
-        # Check for error indicators in the response
-        if "ticker" not in price_data or price_data["ticker"].lower() != symbol.lower():
-            print(f"Tiingo IEX returned data for an unexpected ticker: {price_data.get('ticker')}")
-            return None, None
-        if "last" not in price_data:
-            print(f"No 'last' price found in Tiingo IEX response for {symbol}")
-            return None, None
+    Args:
+        client (httpx.AsyncClient): The shared application HTTP client.
+        symbol (str): The stock symbol.
+        api_key (str): Your Tiingo API Key
+        delay_minutes (int): The target delay. Not directly used by this function,
+            but included for consistency with the yfinance function.
 
-        price = float(price_data["last"])  # Use the "last" price (most recent)
-        timestamp = price_data["timestamp"]  # Tiingo provides a timestamp
+    Returns:
+        float:  The price, or None on error.
+        str: The timestamp, or None on error.
+    """
+    url = "https://api.tiingo.com/iex/"
+    params = {
+        'tickers': symbol,
+        'token': api_key
+    }
 
-        return price, timestamp
+    try:
+        response = await client.get(url, params=params, headers=_TIINGO_HEADERS)
+        response.raise_for_status()
+        return _parse_tiingo_iex_response(symbol, response.json())
     
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Tiingo IEX Request Error: {e}")
         return None, None
     except (KeyError, ValueError, TypeError) as e:
@@ -111,10 +202,9 @@ def get_approximate_delayed_price_yfinance(symbol, delay_minutes=15):
     Gets an approximate 15-minute delayed stock price using yfinance.
 
     This function uses yfinance's 1-minute intraday data.  Because yfinance
-    data isn't perfectly real-time, this is an *approximation*.  The function
-    waits until at least `delay_minutes` have passed since the market opened
-    before fetching data, to increase the likelihood of getting data that's
-    at least somewhat delayed.
+    data isn't perfectly real-time, this is an *approximation*.  Until at
+    least `delay_minutes` have passed since the market opened it returns
+    (None, None) straight away rather than waiting for data to appear.
 
     Args:
         symbol (str): The stock symbol (e.g., "AAPL").
@@ -126,52 +216,46 @@ def get_approximate_delayed_price_yfinance(symbol, delay_minutes=15):
     """
     try:
         # 1. Get the current time in Eastern Time (US market time)
-        eastern = pytz.timezone('US/Eastern')
-        now_eastern = datetime.now(eastern)
+        now_eastern = datetime.now(EASTERN)
 
         # 2. Calculate market open time (9:30 AM Eastern)
-        market_open = now_eastern.replace(hour=9, minute=30, second=0, microsecond=0)
+        market_open = datetime.combine(now_eastern.date(), MARKET_OPEN_TIME, tzinfo=EASTERN)
 
         # 3. Calculate the target time (current time - delay)
         target_time = now_eastern - timedelta(minutes=delay_minutes)
 
-        # 4. Wait until at least the delay has passed since market open.
+        # 4. Give up until at least the delay has passed since market open.
+        # This runs in a request's worker thread, so never sleep here.
         if now_eastern < market_open + timedelta(minutes=delay_minutes):
             wait_seconds = (market_open + timedelta(minutes=delay_minutes) - now_eastern).total_seconds()
-            print(f"Waiting {wait_seconds:.0f} seconds for market data to become available...")
-            time.sleep(wait_seconds)
-            # Recalculate target time after waiting.
-            now_eastern = datetime.now(eastern)
-            target_time = now_eastern - timedelta(minutes=delay_minutes)
-
+            print(f"Market data for {symbol} not available for another {wait_seconds:.0f} seconds")
+            return None, None
 
-        # 5. Fetch 1-minute intraday data
-        ticker = yf.Ticker(symbol)
-        # Get enough data to cover the delay and current time
-        data = ticker.history(interval="1m", period="2d") #get last 2 days of 1min interval
+        # 5. Fetch 1-minute intraday data (already in Eastern Time)
+        data = _get_intraday_history(symbol)
 
         if data.empty:
             print(f"No 1-minute data available for {symbol}")
             return None, None
-        
-        # 6. Convert the index to Eastern Time.  CRUCIAL step.
-        data.index = data.index.tz_convert('US/Eastern')
 
-
-        # 7. Find the closest available timestamp to the target time.
-        # Find the closest timestamp *before* the target time
-        available_times = data.index[data.index <= target_time]
-        if available_times.empty:
+        # 6. Find the closest available timestamp to the target time.
+        # Binary search the (sorted) index for the last timestamp at or before the target time
+        position = data.index.searchsorted(target_time, side="right") - 1
+        if position < 0:
              print(f"No data available for {symbol} before {target_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
              return None, None
-            
-        closest_timestamp = available_times.max() # Get latest available
 
-        # 8. Extract the price
-        price = data['Close'][closest_timestamp]
+        closest_timestamp = data.index[position]
+
+        # 7. Extract the price
+        price = float(data['Close'].iat[position])
         timestamp_str = closest_timestamp.strftime('%Y-%m-%d %H:%M:%S %Z')
+        if math.isnan(price):
+            # A missing close must not win the provider race as "nan"
+            print(f"No close price for {symbol} at {timestamp_str}")
+            return None, None
 
-        return float(price), timestamp_str
+        return price, timestamp_str
 
     except Exception as e:
         print(f"Error fetching data for {symbol}: {e}")
@@ -1,8 +1,12 @@
 # main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+import httpx
+import redis.asyncio as redis
 import uvicorn
 from api.financial_insights import router as financial_insights_router
-from api.stock_quote import router as stock_quote_router
+from api.stock_quote import log_missing_api_keys, router as stock_quote_router
 from api.arxiv_recent_articles import router as arxiv_router  # Verify this import
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic_settings import BaseSettings
@@ -12,20 +16,51 @@ class Settings(BaseSettings):
     APP_HOST: str = "0.0.0.0"
     APP_PORT: int = 7171
     CORS_ORIGINS: str
+    REDIS_URL: str = "redis://localhost:6379/0"
 
     class Config:
         env_file = ".env"
 
     def get_cors_origins(self) -> List[str]:
-        return [origin.strip() for origin in self.CORS_ORIGINS.split(',')]
+        # Blanks, duplicates, trailing slashes and entries without an http(s)
+        # scheme can never equal a browser's Origin header, so drop them up front
+        origins = (origin.strip().rstrip('/') for origin in self.CORS_ORIGINS.split(','))
+        return list(dict.fromkeys(
+            origin for origin in origins if origin.startswith(("http://", "https://"))
+        ))
 
 # Initialize settings
 settings = Settings()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_missing_api_keys()
+    # One pooled client for the whole process so upstream calls reuse
+    # keep-alive connections instead of a fresh TCP+TLS handshake each time.
+    # HTTP/2 lets concurrent requests to the same host share one connection.
+    app.state.http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=10,
+        limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=30)
+    )
+    # Response cache shared by all workers; see services/cache.py. Short
+    # timeouts so a hung or unreachable Redis degrades to uncached responses
+    # instead of stalling every request.
+    app.state.redis = redis.from_url(
+        settings.REDIS_URL,
+        socket_connect_timeout=0.25,
+        socket_timeout=0.25
+    )
+    yield
+    await app.state.http_client.aclose()
+    await app.state.redis.aclose()
+
 app = FastAPI(
     title="Financial Insights API",
     description="API for retrieving financial insights for stocks and arXiv articles",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware with origins from environment
@@ -0,0 +1,158 @@
+# services/cache.py
+import asyncio
+import functools
+import time
+from typing import NamedTuple
+
+import orjson
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from redis.exceptions import RedisError
+
+class CachePolicy(NamedTuple):
+    """How long a cached endpoint response is fresh, and how long it is kept
+    around afterwards as a fallback for when the upstream is failing."""
+    name: str
+    ttl: int
+    stale_ttl: int
+
+QUOTE_POLICY = CachePolicy(name="sq", ttl=10, stale_ttl=3600)
+INSIGHTS_POLICY = CachePolicy(name="fi", ttl=3600, stale_ttl=86400)
+
+# Same options as FastAPI's ORJSONResponse, which is the app's default response class
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _cache_key(policy, params):
+    """Build a key such as 'fi:detailed=False&ticker=AAPL' from the query parameters"""
+    query = "&".join(f"{name}={params[name]}" for name in sorted(params))
+    return f"{policy.name}:{query}"
+
+async def _read_entry(redis_client, key):
+    if redis_client is None:
+        return None
+    try:
+        raw = await redis_client.hgetall(key)
+    except RedisError as e:
+        print(f"Cache read failed for {key}: {e}")
+        return None
+    if not raw:
+        return None
+    raw = {k.decode(): v for k, v in raw.items()}
+    return {
+        "body": raw["body"],
+        "status": int(raw["status"]),
+        "generated_at": float(raw["generated_at"]),
+        "stale_at": float(raw["stale_at"])
+    }
+
+async def _write_entry(redis_client, key, entry, policy):
+    if redis_client is None:
+        return
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=entry)
+            pipe.expire(key, policy.ttl + policy.stale_ttl)
+            await pipe.execute()
+    except RedisError as e:
+        print(f"Cache write failed for {key}: {e}")
+
+def _respond(entry, cache_state):
+    return Response(
+        content=entry["body"],
+        status_code=entry["status"],
+        media_type="application/json",
+        headers={"X-Cache": cache_state}
+    )
+
+# Cache key -> future for the upstream refresh currently running in this process
+_inflight = {}
+
+async def _refresh(handler, kwargs, key, entry, policy, redis_client):
+    """
+    Call the endpoint and store its response.
+
+    Returns:
+        tuple: (entry, cache_state) to respond with; the previous entry and
+        "STALE" if the upstream failed and one is held.
+    """
+    try:
+        body = await handler(**kwargs)
+    except Exception as e:
+        if entry is None or (isinstance(e, HTTPException) and e.status_code < 500):
+            raise
+        print(f"Upstream failed for {key}, serving stale response: {e}")
+        return entry, "STALE"
+
+    now = time.time()
+    entry = {
+        # jsonable_encoder first, as FastAPI does for uncached responses, so
+        # values such as Decimal or set are handled; then stored and returned
+        # as the serialized bytes, so a hit never re-encodes
+        "body": orjson.dumps(jsonable_encoder(body), option=_ORJSON_OPTIONS),
+        "status": 200,
+        "generated_at": now,
+        "stale_at": now + policy.ttl
+    }
+    await _write_entry(redis_client, key, entry, policy)
+    return entry, "MISS"
+
+def cache_response(policy):
+    """
+    Cache a JSON endpoint in Redis according to `policy`.
+
+    The decorated endpoint must accept a `request: Request` parameter so the
+    shared Redis client can be reached through `request.app.state.redis`. The
+    cache key is built from the remaining query parameters; a `ticker`
+    parameter is stripped and upper-cased first, and passed to the endpoint
+    in that form, so 'aapl' and 'AAPL' share one entry. When the upstream
+    fails (any exception other than a 4xx HTTPException) and an expired entry
+    is still held, that entry is returned with an `X-Cache: STALE` header
+    instead of an error. If Redis is unreachable the endpoint runs uncached.
+
+    Concurrent misses for the same key within a process share a single
+    upstream call: the first request refreshes the entry and the others await
+    its outcome, so a burst at expiry does not fan out to the upstream.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(**kwargs):
+            request: Request = kwargs["request"]
+            redis_client = getattr(request.app.state, "redis", None)
+            if isinstance(kwargs.get("ticker"), str):
+                kwargs["ticker"] = kwargs["ticker"].strip().upper()
+            key = _cache_key(policy, {k: v for k, v in kwargs.items() if k != "request"})
+
+            entry = await _read_entry(redis_client, key)
+            if entry is not None and time.time() < entry["stale_at"]:
+                return _respond(entry, "HIT")
+
+            while key in _inflight:
+                inflight = _inflight[key]
+                # Shielded so one waiter disconnecting doesn't cancel the refresh for everyone
+                result = await asyncio.shield(inflight)
+                if result is not None:
+                    return _respond(*result)
+                # The refreshing request was cancelled; the first waiter to get
+                # here takes over the refresh and the rest wait on it instead
+
+            future = asyncio.get_running_loop().create_future()
+            _inflight[key] = future
+            try:
+                result = await _refresh(handler, kwargs, key, entry, policy, redis_client)
+            except asyncio.CancelledError:
+                # Only this request was cancelled: wake the waiters with None
+                # so they re-elect a refresher rather than failing with it
+                future.set_result(None)
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # Mark it retrieved so a refresh nobody else awaited isn't logged as unhandled
+                future.exception()
+                raise
+            finally:
+                _inflight.pop(key, None)
+            future.set_result(result)
+            return _respond(*result)
+
+        return wrapper
+    return decorator
@@ -1,37 +1,113 @@
 # services/fin_insight_service.py
+import importlib
 import json
 import os
-import re
 import subprocess
 import sys
 
-def get_financial_data(ticker):
-    """Call the fin_insight CLI tool and parse its output"""
-    # Find the fin_insight.py file location
-    fin_insight_path = None
+import orjson
+
+# Opt-in in-process entry point for fin-insight as "module:function", e.g.
+# "package.module:function". It must take a ticker, return the same
+# dict the CLI prints as JSON (or None), and be safe to call from several
+# threads at once. When unset, the CLI script is run in a subprocess.
+FIN_INSIGHT_ENTRYPOINT = os.getenv("FIN_INSIGHT_ENTRYPOINT")
+
+def _load_fin_insight_api(entrypoint):
+    """Import the configured entry point once, or return None to use the CLI"""
+    if not entrypoint:
+        return None
+    module_name, _, function_name = entrypoint.partition(":")
+    try:
+        module = importlib.import_module(module_name)
+    except (Exception, SystemExit) as e:
+        # Importing a script may parse argv or exit; never let that take the server down
+        print(f"Could not import {module_name} for FIN_INSIGHT_ENTRYPOINT, using the fin_insight CLI: {e!r}")
+        return None
+    func = getattr(module, function_name, None)
+    if not callable(func):
+        print(f"FIN_INSIGHT_ENTRYPOINT {entrypoint} is not a callable, using the fin_insight CLI")
+        return None
+    return func
+
+def _find_fin_insight_script():
+    """Find the fin_insight.py file location on sys.path"""
     for path in sys.path:
         potential_path = os.path.join(path, 'fin_insight.py')
         if os.path.exists(potential_path):
-            fin_insight_path = potential_path
-            break
-            
-    if not fin_insight_path:
-        # Try to find it in the site-packages directory
-        for path in sys.path:
-            if 'site-packages' in path:
-                potential_path = os.path.join(path, 'fin_insight', 'fin_insight.py')
-                if os.path.exists(potential_path):
-                    fin_insight_path = potential_path
-                    break
-    
-    if not fin_insight_path:
+            return potential_path
+
+    # Try to find it in the site-packages directory
+    for path in sys.path:
+        if 'site-packages' in path:
+            potential_path = os.path.join(path, 'fin_insight', 'fin_insight.py')
+            if os.path.exists(potential_path):
+                return potential_path
+    return None
+
+_json_decoder = json.JSONDecoder()
+
+def _extract_json_object(output):
+    """
+    Parse the JSON object that starts at the first '{' in the CLI output.
+
+    The object normally ends at the output's last '}', which orjson parses in
+    C much faster than the stdlib. If text containing braces follows it,
+    raw_decode stops at the object's own closing brace in a single forward
+    pass instead.
+
+    Raises:
+        ValueError: If the output holds no JSON object or it is invalid.
+    """
+    start = output.find('{')
+    if start == -1:
+        raise ValueError("No JSON data found in fin-insight output")
+    end = output.rfind('}')
+    if end > start:
+        try:
+            return orjson.loads(output[start:end + 1])
+        except orjson.JSONDecodeError:
+            pass
+    try:
+        data, _ = _json_decoder.raw_decode(output, start)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in fin-insight output: {e}")
+    return data
+
+# Resolved once at import rather than on every request
+_fin_insight_api = _load_fin_insight_api(FIN_INSIGHT_ENTRYPOINT)
+_fin_insight_path = None if _fin_insight_api else _find_fin_insight_script()
+
+def get_financial_data(ticker):
+    """
+    Get fin_insight data for a ticker.
+
+    Runs the fin_insight CLI script in a subprocess and parses its JSON
+    output. When FIN_INSIGHT_ENTRYPOINT names an importable function, that is
+    called in-process instead, which skips the interpreter start per call.
+    """
+    if _fin_insight_api is None:
+        return _get_financial_data_subprocess(ticker)
+
+    try:
+        data = _fin_insight_api(ticker)
+    except (Exception, SystemExit) as e:
+        print(f"Error calling fin_insight: {e!r}")
+        raise ValueError(f"Error executing fin-insight: {e!r}")
+    if data is not None and not isinstance(data, dict):
+        raise ValueError(f"fin-insight returned {type(data).__name__} instead of a dict")
+    return data
+
+def _get_financial_data_subprocess(ticker):
+    """Call the fin_insight CLI tool and parse its output"""
+    if not _fin_insight_path:
         print("Could not find fin_insight.py")
         raise ValueError("fin-insight package not found in the system")
     
     # Run the fin_insight command with the ticker as an argument
     try:
         result = subprocess.run(
-            [sys.executable, fin_insight_path, ticker],
+            [sys.executable, _fin_insight_path, ticker],
             capture_output=True,
             text=True,
             check=True
@@ -41,17 +117,7 @@ def get_financial_data(ticker):
         print(f"fin_insight output: {result.stdout}")
         
         # Extract JSON from the output
-        # Look for JSON content (starts with { and ends with })
-        json_match = re.search(r'(\{.*\})', result.stdout, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1)
-            try:
-                data = json.loads(json_str)
-                return data
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON in fin-insight output: {e}")
-        else:
-            raise ValueError("No JSON data found in fin-insight output")
+        return _extract_json_object(result.stdout)
             
     except subprocess.CalledProcessError as e:
         print(f"Error calling fin_insight: {e}")
@@ -26,13 +26,26 @@ def main():
             sys.executable, "-m", "uvicorn",
             "main:app",
             "--host", os.getenv('APP_HOST', '0.0.0.0'),
-            "--port", os.getenv('APP_PORT', '7171'),
-            "--reload"
+            "--port", os.getenv('APP_PORT', '7171')
         ]
+        dev_mode = os.getenv('DEV') == '1'
+        if dev_mode:
+            cmd.append("--reload")
+        else:
+            # --reload and --workers are mutually exclusive, so production runs
+            # one worker per CPU on the faster uvloop/httptools implementations
+            cmd += [
+                "--workers", os.getenv('WEB_CONCURRENCY', str(os.cpu_count() or 1)),
+                # uvloop does not support Windows
+                "--loop", "asyncio" if sys.platform == "win32" else "uvloop",
+                "--http", "httptools",
+                "--no-access-log"
+            ]
         
         print(f"Starting Financial Insights API server...")
         print(f"Host: {os.getenv('APP_HOST')}")
         print(f"Port: {os.getenv('APP_PORT')}")
+        print(f"Mode: {'development (auto-reload)' if dev_mode else 'production'}")
         
         subprocess.run(cmd)
         